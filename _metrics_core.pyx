@@ -0,0 +1,61 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+# Ahead-of-time build of metrics._node_metrics_jit, used when Numba is missing.
+from libc.math cimport exp, hypot, sqrt
+from libc.stdint cimport int64_t
+
+
+def node_metrics(const double[::1] cap_cpu, const double[::1] cap_mem,
+                 const double[::1] used_cpu, const double[::1] used_mem,
+                 const int64_t[::1] pod_count, double unscheduled_ratio,
+                 double k0, double k1, double k2, bint per_core, bint lbf_on_util):
+    cdef Py_ssize_t n_nodes = cap_cpu.shape[0]
+    cdef Py_ssize_t i
+    cdef double cpu_u, mem_u, x_cpu, x_mem, cores, norm_u, norm_v
+    cdef double s_cpu = 0.0, s_mem = 0.0, s_pod = 0.0
+    cdef double v_cpu = 0.0, v_mem = 0.0, v_pod = 0.0
+    cdef double m_cpu, m_mem, m_pod
+    cdef double total_power = 0.0, s_rf = 0.0
+    cdef long active_nodes = 0
+
+    if n_nodes == 0:
+        return 0.0, 0.0, 0.0, 0, 0.0, 0.0
+
+    for i in range(n_nodes):
+        x_cpu = _util(used_cpu[i], cap_cpu[i]) if lbf_on_util else used_cpu[i]
+        x_mem = _util(used_mem[i], cap_mem[i]) if lbf_on_util else used_mem[i]
+        s_cpu += x_cpu
+        s_mem += x_mem
+        s_pod += pod_count[i]
+
+        # Heterogeneous Power Calculation: only active nodes draw power
+        if pod_count[i] > 0:
+            active_nodes += 1
+            cpu_u = _util(used_cpu[i], cap_cpu[i])
+            cores = (cap_cpu[i] if cap_cpu[i] > 0 else 1.0) if per_core else 1.0
+            total_power += k0 * cores + k1 * cores * (1.0 - exp(-k2 * cpu_u))
+
+        norm_u = hypot(max(cap_cpu[i] - used_cpu[i], 0.0), max(cap_mem[i] - used_mem[i], 0.0))
+        norm_v = hypot(cap_cpu[i], cap_mem[i])
+        if norm_v > 1e-9:
+            s_rf += (norm_u / norm_v) * unscheduled_ratio
+
+    m_cpu = s_cpu / n_nodes
+    m_mem = s_mem / n_nodes
+    m_pod = s_pod / n_nodes
+    for i in range(n_nodes):
+        x_cpu = _util(used_cpu[i], cap_cpu[i]) if lbf_on_util else used_cpu[i]
+        x_mem = _util(used_mem[i], cap_mem[i]) if lbf_on_util else used_mem[i]
+        v_cpu += (x_cpu - m_cpu) * (x_cpu - m_cpu)
+        v_mem += (x_mem - m_mem) * (x_mem - m_mem)
+        v_pod += (pod_count[i] - m_pod) * (pod_count[i] - m_pod)
+
+    return (sqrt(v_cpu / n_nodes) / m_cpu if m_cpu > 1e-9 else 0.0,
+            sqrt(v_mem / n_nodes) / m_mem if m_mem > 1e-9 else 0.0,
+            sqrt(v_pod / n_nodes) / m_pod if m_pod > 1e-9 else 0.0,
+            active_nodes, total_power, s_rf / n_nodes)
+
+
+cdef inline double _util(double used, double cap) noexcept nogil:
+    if cap <= 0:
+        return 0.0
+    return min(used / cap, 1.0)
@@ -0,0 +1,522 @@
+"""Scheduling metrics for kube-scheduler-simulator cluster exports.
+
+Shared by check_main.py and experiment_setups&outputs/check_main.py, which
+differ only in how power and load balancing are modelled:
+
+* power_model="per_core" scales k0/k1 by each node's core count (Watts per
+  core); "per_node" applies them once per active node.
+* lbf_basis="utilization" computes LBF over per-node utilization;
+  "usage" uses the absolute requested CPU/memory.
+
+Run it directly to print the metrics for one or more exports.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+from functools import lru_cache
+
+import numpy as np
+import yaml
+from yaml.events import (AliasEvent, DocumentStartEvent, MappingEndEvent, MappingStartEvent,
+                         ScalarEvent, SequenceEndEvent, SequenceStartEvent, StreamEndEvent,
+                         StreamStartEvent)
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Defaults represent Watts per Core
+DEFAULT_K0 = 10.0
+DEFAULT_K1 = 5.0
+DEFAULT_K2 = 4.0
+
+POWER_MODELS = ("per_core", "per_node")
+LBF_BASES    = ("utilization", "usage")
+
+# Fields read from each exported object; everything else is skipped while parsing.
+NODE_FIELDS = {'metadata': {'name': True}, 'status': {'allocatable': True, 'capacity': True}}
+POD_FIELDS  = {'spec': {'nodeName': True, 'containers': [{'resources': {'requests': True}}]}}
+
+# The extracted fields of each export are cached next to it as <export>.metrics.jsonl.
+SIDECAR_SUFFIX = ".metrics.jsonl"
+
+GIB_PER_MIB  = 1.0 / 1024.0
+GIB_PER_KIB  = 1.0 / 1024.0 ** 2
+GIB_PER_BYTE = 1.0 / 1024.0 ** 3
+
+# Quantity units are at most two characters, so dispatch on the last one.
+@lru_cache(maxsize=4096)
+def parse_cpu(val) -> float:
+    if not val:
+        return 0.0
+    s = (val if type(val) is str else str(val)).strip()
+    if s[-1] == 'm':
+        return float(s[:-1]) / 1000.0
+    return float(s)
+
+@lru_cache(maxsize=4096)
+def parse_mem(val) -> float:
+    if not val:
+        return 0.0
+    s = (val if type(val) is str else str(val)).strip()
+    if s[-1] == 'i': s = s[:-1]
+    unit = s[-1]
+    if unit == 'G': return float(s[:-1])
+    if unit == 'M': return float(s[:-1]) * GIB_PER_MIB
+    if unit == 'K': return float(s[:-1]) * GIB_PER_KIB
+    return float(s) * GIB_PER_BYTE
+
+def coeff_of_variation(values) -> float:
+    arr = np.asarray(values, dtype=float)
+    if arr.size == 0:
+        return 0.0
+    mu = arr.mean()
+    if mu <= 1e-9:
+        return 0.0
+    dev = arr - mu
+    return float(math.sqrt(dev.dot(dev) / arr.size) / mu)
+
+_resolver = yaml.resolver.Resolver()
+_constructor = yaml.constructor.SafeConstructor()
+
+MERGE_TAG = 'tag:yaml.org,2002:merge'
+
+def _tag(ev):
+    tag = ev.tag
+    if tag is None or tag == '!':
+        tag = _resolver.resolve(yaml.ScalarNode, ev.value, ev.implicit)
+    return tag
+
+def _scalar(ev):
+    tag = _tag(ev)
+    construct = _constructor.yaml_constructors.get(tag, _constructor.yaml_constructors[None])
+    return construct(_constructor, yaml.ScalarNode(tag, ev.value, style=ev.style))
+
+def _is_merge(ev):
+    return isinstance(ev, ScalarEvent) and _tag(ev) == MERGE_TAG
+
+def _merge_into(merged, value):
+    # Same precedence as SafeConstructor.flatten_mapping: a later << key
+    # overrides an earlier one, and within a list the first mapping wins.
+    if isinstance(value, dict):
+        merged.update(value)
+    elif isinstance(value, list) and all(isinstance(m, dict) for m in value):
+        for m in reversed(value):
+            merged.update(m)
+    else:
+        raise yaml.constructor.ConstructorError(
+            None, None, "expected a mapping or list of mappings for merging, "
+            f"but found {type(value).__name__}", None)
+
+def _skip(ev, events, anchors):
+    # Anchored nodes are built in full even here, since a kept field may
+    # alias them later in the document.
+    depth = 0
+    while True:
+        if not isinstance(ev, AliasEvent) and getattr(ev, 'anchor', None) is not None:
+            _build(ev, events, True, anchors)
+        elif isinstance(ev, (MappingStartEvent, SequenceStartEvent)):
+            depth += 1
+        elif isinstance(ev, (MappingEndEvent, SequenceEndEvent)):
+            depth -= 1
+        if depth == 0:
+            return
+        ev = next(events)
+
+def _build(ev, events, keep, anchors):
+    # keep mirrors the document shape: a dict of wanted keys, a one-item
+    # list for sequences, or True to take the whole subtree. Anchored nodes
+    # are always taken whole so every alias of them sees the same object.
+    if isinstance(ev, AliasEvent):
+        try:
+            return anchors[ev.anchor]
+        except KeyError:
+            raise yaml.YAMLError(f"found undefined alias {ev.anchor!r}") from None
+    if ev.anchor is not None:
+        keep = True
+    if isinstance(ev, ScalarEvent):
+        out = _scalar(ev)
+        if ev.anchor is not None:
+            anchors[ev.anchor] = out
+        return out
+    if isinstance(ev, MappingStartEvent):
+        out = {}
+        merged = {}
+        if ev.anchor is not None:
+            anchors[ev.anchor] = out
+        for key_ev in events:
+            if isinstance(key_ev, MappingEndEvent):
+                # Explicit keys take precedence over merged ones.
+                for key, value in merged.items():
+                    if key not in out and (keep is True or key in keep):
+                        out[key] = value
+                return out
+            if _is_merge(key_ev):
+                _merge_into(merged, _build(next(events), events, True, anchors))
+                continue
+            key = _build(key_ev, events, True, anchors)
+            value_ev = next(events)
+            sub = True if keep is True else keep.get(key)
+            if sub is None:
+                _skip(value_ev, events, anchors)
+            else:
+                out[key] = _build(value_ev, events, sub, anchors)
+    sub = True if keep is True else keep[0]
+    out = []
+    if ev.anchor is not None:
+        anchors[ev.anchor] = out
+    for item_ev in events:
+        if isinstance(item_ev, SequenceEndEvent):
+            return out
+        out.append(_build(item_ev, events, sub, anchors))
+
+def iter_sections(f, sections):
+    """Yield (key, item) for every item of the wanted top-level lists.
+
+    Items are built one at a time from the parser's event stream, keeping
+    only the fields named in sections[key], so a large export never has to
+    be materialized in full. Like yaml.safe_load, the stream must hold a
+    single document; its root must be a mapping.
+    """
+    name = getattr(f, 'name', '<stream>')
+    events = yaml.parse(f, Loader=SafeLoader)
+    root = next(ev for ev in events
+                if not isinstance(ev, (StreamStartEvent, DocumentStartEvent)))
+    if not isinstance(root, MappingStartEvent):
+        raise ValueError(f"{name}: expected a mapping at the top of the export")
+    anchors = {}
+    merged  = {}
+    seen    = set()
+    for key_ev in events:
+        if isinstance(key_ev, MappingEndEvent):
+            break
+        if _is_merge(key_ev):
+            _merge_into(merged, _build(next(events), events, True, anchors))
+            continue
+        key = _build(key_ev, events, True, anchors)
+        seen.add(key)
+        value_ev = next(events)
+        keep = sections.get(key)
+        if keep is None or not isinstance(value_ev, SequenceStartEvent):
+            _skip(value_ev, events, anchors)
+            continue
+        if value_ev.anchor is not None:
+            yield from ((key, item) for item in _build(value_ev, events, True, anchors))
+            continue
+        for item_ev in events:
+            if isinstance(item_ev, SequenceEndEvent):
+                break
+            yield key, _build(item_ev, events, keep, anchors)
+    for key, value in merged.items():
+        if key in sections and key not in seen and isinstance(value, list):
+            yield from ((key, item) for item in value)
+    next(events)  # DocumentEndEvent
+    if not isinstance(next(events), StreamEndEvent):
+        raise ValueError(f"{name}: expected a single document")
+
+def _node_metrics_numpy(cap_cpu, cap_mem, used_cpu, used_mem, pod_count,
+                        unscheduled_ratio, k0, k1, k2, per_core, lbf_on_util):
+    n_nodes = cap_cpu.size
+
+    cpu_utils = np.minimum(np.divide(used_cpu, cap_cpu, out=np.zeros(n_nodes), where=cap_cpu > 0), 1.0)
+    mem_utils = np.minimum(np.divide(used_mem, cap_mem, out=np.zeros(n_nodes), where=cap_mem > 0), 1.0)
+
+    if lbf_on_util:
+        lbf_cpu, lbf_mem = coeff_of_variation(cpu_utils), coeff_of_variation(mem_utils)
+    else:
+        lbf_cpu, lbf_mem = coeff_of_variation(used_cpu), coeff_of_variation(used_mem)
+
+    # Heterogeneous Power Calculation: only active nodes draw power
+    active = pod_count > 0
+    cores  = np.where(cap_cpu > 0, cap_cpu, 1.0) if per_core else np.ones(n_nodes)
+    power  = np.where(active, k0 * cores + k1 * cores * (1.0 - np.exp(-k2 * cpu_utils)), 0.0)
+
+    norm_u = np.hypot(np.maximum(cap_cpu - used_cpu, 0.0), np.maximum(cap_mem - used_mem, 0.0))
+    norm_v = np.hypot(cap_cpu, cap_mem)
+    rf_values = np.divide(norm_u, norm_v, out=np.zeros(n_nodes), where=norm_v > 1e-9) * unscheduled_ratio
+
+    avg_rf = float(rf_values.mean()) if n_nodes else 0.0
+
+    return (lbf_cpu, lbf_mem, coeff_of_variation(pod_count),
+            int(active.sum()), float(power.sum()), avg_rf)
+
+def _node_metrics_jit(cap_cpu, cap_mem, used_cpu, used_mem, pod_count,
+                      unscheduled_ratio, k0, k1, k2, per_core, lbf_on_util):
+    # Same metrics as _node_metrics_numpy, fused into two passes over the nodes.
+    n_nodes = cap_cpu.shape[0]
+    if n_nodes == 0:
+        return 0.0, 0.0, 0.0, 0, 0.0, 0.0
+
+    x_cpu        = np.empty(n_nodes)
+    x_mem        = np.empty(n_nodes)
+    s_cpu = s_mem = s_pod = 0.0
+    active_nodes = 0
+    total_power  = 0.0
+    s_rf         = 0.0
+    for i in range(n_nodes):
+        cpu_u = min(used_cpu[i] / cap_cpu[i], 1.0) if cap_cpu[i] > 0 else 0.0
+        mem_u = min(used_mem[i] / cap_mem[i], 1.0) if cap_mem[i] > 0 else 0.0
+        x_cpu[i] = cpu_u if lbf_on_util else used_cpu[i]
+        x_mem[i] = mem_u if lbf_on_util else used_mem[i]
+        s_cpu += x_cpu[i]
+        s_mem += x_mem[i]
+        s_pod += pod_count[i]
+
+        # Heterogeneous Power Calculation: only active nodes draw power
+        if pod_count[i] > 0:
+            active_nodes += 1
+            cores = (cap_cpu[i] if cap_cpu[i] > 0 else 1.0) if per_core else 1.0
+            total_power += k0 * cores + k1 * cores * (1.0 - math.exp(-k2 * cpu_u))
+
+        norm_u = math.hypot(max(cap_cpu[i] - used_cpu[i], 0.0), max(cap_mem[i] - used_mem[i], 0.0))
+        norm_v = math.hypot(cap_cpu[i], cap_mem[i])
+        if norm_v > 1e-9:
+            s_rf += (norm_u / norm_v) * unscheduled_ratio
+
+    m_cpu = s_cpu / n_nodes
+    m_mem = s_mem / n_nodes
+    m_pod = s_pod / n_nodes
+    v_cpu = v_mem = v_pod = 0.0
+    for i in range(n_nodes):
+        v_cpu += (x_cpu[i] - m_cpu) ** 2
+        v_mem += (x_mem[i] - m_mem) ** 2
+        v_pod += (pod_count[i] - m_pod) ** 2
+
+    lbf_cpu = math.sqrt(v_cpu / n_nodes) / m_cpu if m_cpu > 1e-9 else 0.0
+    lbf_mem = math.sqrt(v_mem / n_nodes) / m_mem if m_mem > 1e-9 else 0.0
+    lbf_pod = math.sqrt(v_pod / n_nodes) / m_pod if m_pod > 1e-9 else 0.0
+
+    return lbf_cpu, lbf_mem, lbf_pod, active_nodes, total_power, s_rf / n_nodes
+
+def _load_numba_kernel():
+    try:
+        from numba import njit
+    except ImportError:
+        return None
+    return njit(cache=True, error_model='numpy')(_node_metrics_jit)
+
+def _load_cython_kernel():
+    # Builds _metrics_core.pyx on first import; needs Cython and a C compiler.
+    try:
+        import pyximport
+    except ImportError:
+        return None
+    importers = pyximport.install(language_level=3)
+    try:
+        from _metrics_core import node_metrics
+    except ImportError:
+        return None
+    finally:
+        pyximport.uninstall(*importers)
+    return node_metrics
+
+# On clusters of tens of nodes the NumPy kernel takes well under a
+# millisecond, while importing Numba and loading its cached build costs
+# ~0.3s per process, so the compiled kernels are opt-in. With METRICS_JIT=1,
+# prefer Numba, then the Cython build of the same kernel, then plain NumPy.
+if os.environ.get("METRICS_JIT", "0") != "0":
+    _node_metrics = _load_numba_kernel() or _load_cython_kernel() or _node_metrics_numpy
+else:
+    _node_metrics = _node_metrics_numpy
+
+def _json_dumps(obj) -> bytes:
+    return orjson.dumps(obj) if orjson is not None else json.dumps(obj).encode()
+
+def _json_loads(data: bytes):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def _discard(f, path):
+    f.close()
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def _iter_export(file_path: str, mtime_ns: int, size: int):
+    """Yield (section, item) for the nodes and pods of an export.
+
+    The sidecar is JSON lines: a header naming the export's mtime, size and
+    the NODE_FIELDS/POD_FIELDS it was written for, then one [section, item]
+    per line. It is read only when the header matches exactly; otherwise the
+    YAML is streamed and each item is appended to a fresh sidecar as it is
+    yielded, which replaces the old one once the export has been read.
+    """
+    header  = {'mtime_ns': mtime_ns, 'size': size, 'fields': [NODE_FIELDS, POD_FIELDS]}
+    sidecar = file_path + SIDECAR_SUFFIX
+    try:
+        f = open(sidecar, 'rb')
+    except OSError:
+        f = None
+    if f is not None:
+        with f:
+            try:
+                fresh = _json_loads(f.readline()) == header
+            except ValueError:
+                fresh = False
+            if fresh:
+                for line in f:
+                    section, item = _json_loads(line)
+                    yield section, item
+                return
+
+    tmp = f"{sidecar}.{os.getpid()}.tmp"
+    try:
+        out = open(tmp, 'wb')
+    except OSError:
+        out = None
+    if out is not None:
+        try:
+            out.write(_json_dumps(header) + b"\n")
+        except OSError:
+            _discard(out, tmp)
+            out = None
+    try:
+        with open(file_path, 'rb') as f:
+            for section, item in iter_sections(f, {'nodes': NODE_FIELDS, 'pods': POD_FIELDS}):
+                if out is not None:
+                    try:
+                        out.write(_json_dumps([section, item]) + b"\n")
+                    except (OSError, TypeError):
+                        _discard(out, tmp)
+                        out = None
+                yield section, item
+    except BaseException:
+        if out is not None:
+            _discard(out, tmp)
+        raise
+
+    if out is not None:
+        try:
+            out.close()
+            os.replace(tmp, sidecar)
+        except OSError:
+            _discard(out, tmp)
+
+def get_metrics(file_path: str, k0: float = DEFAULT_K0, k1: float = DEFAULT_K1,
+                k2: float = DEFAULT_K2, *, power_model: str = "per_core",
+                lbf_basis: str = "utilization") -> dict:
+    if power_model not in POWER_MODELS:
+        raise ValueError(f"unknown power_model {power_model!r}, expected one of {POWER_MODELS}")
+    if lbf_basis not in LBF_BASES:
+        raise ValueError(f"unknown lbf_basis {lbf_basis!r}, expected one of {LBF_BASES}")
+
+    st = os.stat(file_path)
+    return dict(_get_metrics_cached(file_path, st.st_mtime_ns, st.st_size,
+                                    k0, k1, k2, power_model, lbf_basis))
+
+@lru_cache(maxsize=16)
+def _get_metrics_cached(file_path: str, mtime_ns: int, size: int,
+                        k0: float, k1: float, k2: float,
+                        power_model: str, lbf_basis: str) -> dict:
+    raw_nodes  = []
+    pod_usage  = {}  # node name -> [cpu, mem, pod count]
+    total_pods = 0
+    no_node    = 0
+
+    for section, item in _iter_export(file_path, mtime_ns, size):
+        if section == 'nodes':
+            raw_nodes.append(item)
+            continue
+
+        total_pods += 1
+        spec      = item.get('spec', {})
+        node_name = spec.get('nodeName')
+
+        if not node_name:
+            no_node += 1
+            continue
+
+        usage = pod_usage.get(node_name)
+        if usage is None:
+            usage = pod_usage[sys.intern(node_name)] = [0.0, 0.0, 0]
+        usage[2] += 1
+
+        containers = spec.get('containers', [])
+        if len(containers) == 1:  # the common case for generated workloads
+            req = containers[0].get('resources', {}).get('requests', {})
+            usage[0] += parse_cpu(req.get('cpu', 0))
+            usage[1] += parse_mem(req.get('memory', 0))
+            continue
+
+        for container in containers:
+            req = container.get('resources', {}).get('requests', {})
+            usage[0] += parse_cpu(req.get('cpu', 0))
+            usage[1] += parse_mem(req.get('memory', 0))
+
+    n_nodes     = len(raw_nodes)
+    name_to_idx = {}
+    cap_cpu     = np.empty(n_nodes)
+    cap_mem     = np.empty(n_nodes)
+    for i, n in enumerate(raw_nodes):
+        name   = n['metadata']['name']
+        status = n.get('status', {})
+        alloc = status.get('allocatable', status.get('capacity', {}))
+
+        name_to_idx[sys.intern(name)] = i
+        cap_cpu[i] = parse_cpu(alloc.get('cpu', '1'))
+        cap_mem[i] = parse_mem(alloc.get('memory', '1G'))
+
+    used_cpu  = [0.0] * n_nodes
+    used_mem  = [0.0] * n_nodes
+    pod_count = [0] * n_nodes
+
+    # Pods bound to a node missing from the export count as unscheduled.
+    unscheduled_count = no_node
+    for node_name, (cpu, mem, count) in pod_usage.items():
+        idx = name_to_idx.get(node_name)
+        if idx is None:
+            unscheduled_count += count
+            continue
+        used_cpu[idx]  = cpu
+        used_mem[idx]  = mem
+        pod_count[idx] = count
+
+    used_cpu  = np.array(used_cpu,  dtype=np.float64)
+    used_mem  = np.array(used_mem,  dtype=np.float64)
+    pod_count = np.array(pod_count, dtype=np.int64)
+
+    unscheduled_ratio = unscheduled_count / total_pods if total_pods > 0 else 0.0
+
+    lbf_cpu, lbf_mem, lbf_pod, active_nodes, total_power, avg_rf = _node_metrics(
+        cap_cpu, cap_mem, used_cpu, used_mem, pod_count, unscheduled_ratio,
+        float(k0), float(k1), float(k2), power_model == "per_core", lbf_basis == "utilization")
+
+    return {
+        "LBF (CPU)":                      lbf_cpu,
+        "LBF (Memory)":                   lbf_mem,
+        "LBF (Pod)":                      lbf_pod,
+        "Active Nodes":                   active_nodes,
+        "Total Power (W)":                total_power,
+        "Average Resource Fragmentation": avg_rf,
+        "Unscheduled Pods Ratio":         unscheduled_ratio,
+    }
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Print scheduling metrics for cluster exports.")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--k0", type=float, default=DEFAULT_K0)
+    p.add_argument("--k1", type=float, default=DEFAULT_K1)
+    p.add_argument("--k2", type=float, default=DEFAULT_K2)
+    p.add_argument("--power-model", choices=POWER_MODELS, default="per_core")
+    p.add_argument("--lbf-basis",   choices=LBF_BASES,    default="utilization")
+    return p.parse_args()
+
+def main():
+    args = parse_args()
+    for path in args.files:
+        res = get_metrics(path, args.k0, args.k1, args.k2,
+                          power_model=args.power_model, lbf_basis=args.lbf_basis)
+        print(f"\n--- {path} ---")
+        for k, v in res.items():
+            print(f"{k:<31} | {v:.4f}")
+
+if __name__ == "__main__":
+    main()
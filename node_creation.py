@@ -2,6 +2,11 @@ import yaml
 import random
 import subprocess
 
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
+
 # ─────────────────────────────────────────────────────────────────────────────
 # CHANGE THIS TO MATCH YOUR EXPERIMENT (1, 2, or 3)
 EXPERIMENT = 1
@@ -74,14 +79,17 @@ for i in range(NUM_LARGE):
     mem = random.randint(*NODE_MEM_GIB["large"])
     nodes.append(create_node(f"large-node-{i}", cpu, mem))
 
+manifest = yaml.dump_all(nodes, Dumper=SafeDumper, default_flow_style=False)
+
+# Kept on disk for manual re-applies; kubectl reads the manifest from stdin.
 with open("nodes.yaml", "w") as f:
-    yaml.dump_all(nodes, f, default_flow_style=False)
+    f.write(manifest)
 
 print(f"Created {len(nodes)} nodes ({NUM_SMALL} small, {NUM_MEDIUM} medium, {NUM_LARGE} large).")
 
 result = subprocess.run(
-    ["kubectl", "--kubeconfig", "kubeconfig.yaml", "apply", "-f", "nodes.yaml"],
-    capture_output=True, text=True,
+    ["kubectl", "--kubeconfig", "kubeconfig.yaml", "apply", "-f", "-"],
+    input=manifest, capture_output=True, text=True,
 )
 if result.returncode != 0:
     print("ERROR:", result.stderr)
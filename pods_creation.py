@@ -1,14 +1,17 @@
 import yaml
-import random
+import numpy as np
 import subprocess
 
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
+
 NUM_PODS = 500
 SCHEDULER_NAME = "default-scheduler"
+SEED = None  # set an int to regenerate the same workload
 
-def create_pod(name):
-    cpu_request = round(random.uniform(0.2, 2.0), 2)
-    mem_request = random.randint(256, 2048)
-
+def create_pod(name, cpu_request, mem_request):
     return {
         "apiVersion": "v1",
         "kind": "Pod",
@@ -30,10 +33,17 @@ def create_pod(name):
         }
     }
 
-pods = [create_pod(f"pod-{i}") for i in range(NUM_PODS)]
+rng = np.random.default_rng(SEED)
+cpus = np.round(rng.uniform(0.2, 2.0, NUM_PODS), 2).tolist()
+mems = rng.integers(256, 2048, NUM_PODS, endpoint=True).tolist()
+
+pods = [create_pod(f"pod-{i}", cpus[i], mems[i]) for i in range(NUM_PODS)]
+
+manifest = yaml.dump_all(pods, Dumper=SafeDumper)
 
+# Kept on disk for manual re-applies; kubectl reads the manifest from stdin.
 with open("pods.yaml", "w") as f:
-    yaml.dump_all(pods, f)
+    f.write(manifest)
 
 subprocess.run([
     "kubectl",
@@ -41,8 +51,8 @@ subprocess.run([
     "kubeconfig.yaml",
     "apply",
     "-f",
-    "pods.yaml"
-])
+    "-"
+], input=manifest, text=True)
 
 
 print("Pods created and scheduled.")
@@ -2,6 +2,11 @@ import yaml
 import random
 import subprocess
 
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
+
 # ─────────────────────────────────────────────────────────────────────────────
 # CHANGE THESE TO MATCH YOUR TEST RUN
 EXPERIMENT     = 1                   # 1, 2, or 3
@@ -18,12 +23,10 @@ CPU_MAX_CORES = 1.5
 MEM_MIN_MIB   = 4096  # 2 GiB
 MEM_MAX_MIB   = 6144  # 8 GiB
 
-def create_pod(name: str) -> dict:
-    # Calculate float, then convert directly to milliCPU integer
-    cpu_cores = round(random.uniform(CPU_MIN_CORES, CPU_MAX_CORES), 2)
+def create_pod(name: str, cpu_cores: float, mem: int) -> dict:
+    # Convert the rounded core count directly to a milliCPU integer
     cpu_milli = int(cpu_cores * 1000)
-    mem = random.randint(MEM_MIN_MIB, MEM_MAX_MIB)
-    
+
     return {
         "apiVersion": "v1",
         "kind":       "Pod",
@@ -47,17 +50,23 @@ def create_pod(name: str) -> dict:
     }
 
 random.seed(42) # Ensure exact same pods are generated for both schedulers
+# Drawn cpu-then-memory per pod so the stream matches the published exports.
+draws = [(round(random.uniform(CPU_MIN_CORES, CPU_MAX_CORES), 2),
+          random.randint(MEM_MIN_MIB, MEM_MAX_MIB)) for _ in range(NUM_PODS)]
+
+pods = [create_pod(f"pod-{i}", cpu, mem) for i, (cpu, mem) in enumerate(draws)]
 
-pods = [create_pod(f"pod-{i}") for i in range(NUM_PODS)]
+manifest = yaml.dump_all(pods, Dumper=SafeDumper, default_flow_style=False)
 
+# Kept on disk for manual re-applies; kubectl reads the manifest from stdin.
 with open("pods.yaml", "w") as f:
-    yaml.dump_all(pods, f, default_flow_style=False)
+    f.write(manifest)
 
 print(f"Running Experiment {EXPERIMENT}: Deploying {NUM_PODS} pods using '{SCHEDULER_NAME}'")
 
 result = subprocess.run(
-    ["kubectl", "--kubeconfig", "kubeconfig.yaml", "apply", "-f", "pods.yaml"],
-    capture_output=True, text=True,
+    ["kubectl", "--kubeconfig", "kubeconfig.yaml", "apply", "-f", "-"],
+    input=manifest, capture_output=True, text=True,
 )
 if result.returncode != 0:
     print("ERROR:", result.stderr)